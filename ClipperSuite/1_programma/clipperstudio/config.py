@@ -6,11 +6,13 @@ between the GUI and the processing pipeline."""
 from __future__ import annotations
 
 import json
+import os
 import shutil
 from copy import deepcopy
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Set
 import re
 
 # ---------------------------------------------------------------- filesystem
@@ -24,6 +26,8 @@ FFMPEG_BIN_DIR: Path = DEPENDENCIES_ROOT / "ffmpeg" / "bin"
 YTDLP_DIR: Path = DEPENDENCIES_ROOT / "yt-dlp"
 LAYOUTS_DIR: Path = CONFIG_DIR / "layouts"
 WORKSPACE_METADATA_FILE: Path = CONFIG_DIR / "workspaces.json"
+# String form of LAYOUTS_DIR so per-workspace paths need a single Path build.
+_LAYOUTS_DIR_STR: str = str(LAYOUTS_DIR)
 
 DEFAULT_SETTINGS_PAYLOAD = {
     "rendering": {
@@ -36,6 +40,8 @@ DEFAULT_SETTINGS_PAYLOAD = {
         "font_path": None,
         "crf": 18,
         "x264_preset": "medium",
+        "whisper_model": "small",
+        "encoder": "auto",
     },
     "publication": {
         "publish_interval_minutes": 20,
@@ -64,10 +70,10 @@ DEFAULT_LAYOUT_STATE: Dict[str, Dict[str, object]] = {
     },
     "layers": {
         "video_main": {
-            "x": DEFAULT_CANVAS_WIDTH / 2,
-            "y": DEFAULT_CANVAS_HEIGHT / 2,
+            "x": DEFAULT_CANVAS_WIDTH // 2,
+            "y": DEFAULT_CANVAS_HEIGHT // 2,
             "w": DEFAULT_CANVAS_WIDTH,
-            "h": round(DEFAULT_CANVAS_WIDTH * 9 / 16),
+            "h": (DEFAULT_CANVAS_WIDTH * 9 + 8) // 16,
             "scale": 1.12,
             "fit": "width",
             "anchor": "center",
@@ -75,21 +81,21 @@ DEFAULT_LAYOUT_STATE: Dict[str, Dict[str, object]] = {
             "visible": True,
         },
         "title": {
-            "x": DEFAULT_CANVAS_WIDTH / 2,
+            "x": DEFAULT_CANVAS_WIDTH // 2,
             "y": 140,
             "anchor": "center",
             "locked": False,
             "visible": True,
         },
         "subtitles": {
-            "x": DEFAULT_CANVAS_WIDTH / 2,
+            "x": DEFAULT_CANVAS_WIDTH // 2,
             "y": 1180,
             "anchor": "center",
             "locked": False,
             "visible": True,
         },
         "part_label": {
-            "x": DEFAULT_CANVAS_WIDTH / 2,
+            "x": DEFAULT_CANVAS_WIDTH // 2,
             "y": 1820,
             "anchor": "center",
             "locked": False,
@@ -112,6 +118,29 @@ DEFAULT_LAYOUT_STATE: Dict[str, Dict[str, object]] = {
     },
 }
 
+
+def _freeze_layout(layout: Mapping[str, object]) -> Mapping[str, Mapping[str, object]]:
+    """Return a read-only view of ``layout`` and of its canvas and layers."""
+
+    frozen: Dict[str, object] = dict(layout)
+    canvas = layout.get("canvas")
+    if isinstance(canvas, dict):
+        frozen["canvas"] = MappingProxyType(canvas)
+    layers = layout.get("layers")
+    if isinstance(layers, dict):
+        frozen["layers"] = MappingProxyType(
+            {
+                name: MappingProxyType(layer) if isinstance(layer, dict) else layer
+                for name, layer in layers.items()
+            }
+        )
+    return MappingProxyType(frozen)  # type: ignore[return-value]
+
+
+# Read-only view of the default layout, shared by reference with callers that
+# never mutate it (see ``load_workspace_layout_readonly``).
+_DEFAULT_LAYOUT_RO: Mapping[str, Mapping[str, object]] = _freeze_layout(DEFAULT_LAYOUT_STATE)
+
 DEPENDENCY_HINTS = {
     "ffmpeg": FFMPEG_BIN_DIR,
     "ffprobe": FFMPEG_BIN_DIR,
@@ -128,6 +157,9 @@ DEFAULT_INTERVAL_MINUTES: int = 20
 DEFAULT_RANDOMIZATION_RANGE_SECONDS: int = 120
 DEFAULT_CRF: int = 18
 DEFAULT_X264_PRESET: str = "medium"
+DEFAULT_WHISPER_MODEL: str = "small"
+# "auto" picks the first working hardware encoder, "libx264" forces software.
+DEFAULT_ENCODER: str = "auto"
 DEFAULT_FONT_PATH: Optional[str] = None
 DEFAULT_PART_PREFIX: str = "Parte"
 
@@ -144,18 +176,25 @@ class WorkspaceDirectories:
     logs: Path
 
 
-@dataclass(slots=True)
-class PublishInterval:
-    """Represents the base interval between two clips."""
+class PublishInterval(int):
+    """Represents the base interval between two clips, in seconds.
+
+    Being an immutable ``int`` it costs no more than the number itself and
+    can be shared freely between settings instances.
+    """
 
-    seconds: int = field(default=DEFAULT_INTERVAL_MINUTES * 60)
+    __slots__ = ()
+
+    @property
+    def seconds(self) -> int:
+        return int(self)
 
     @classmethod
     def from_minutes(cls, minutes: float) -> "PublishInterval":
         return cls(int(max(0, minutes * 60)))
 
     def as_minutes(self) -> float:
-        return self.seconds / 60
+        return self / 60
 
     def __str__(self) -> str:  # pragma: no cover - trivial
         minutes = self.as_minutes()
@@ -177,13 +216,15 @@ class RenderingSettings:
     crf: int = DEFAULT_CRF
     x264_preset: str = DEFAULT_X264_PRESET
     show_part_label: bool = True
+    whisper_model: str = DEFAULT_WHISPER_MODEL
+    encoder: str = DEFAULT_ENCODER
 
 
 @dataclass(slots=True)
 class PublicationSettings:
     """Settings related to publication on TikTok."""
 
-    publish_interval: PublishInterval = field(default_factory=PublishInterval)
+    publish_interval: PublishInterval = PublishInterval(DEFAULT_INTERVAL_MINUTES * 60)
     randomize_interval: bool = False
     randomization_range_seconds: int = DEFAULT_RANDOMIZATION_RANGE_SECONDS
     part_label_prefix: str = DEFAULT_PART_PREFIX
@@ -213,6 +254,9 @@ class WorkspaceSettings:
     logs_directory: Path = field(
         default_factory=lambda: DEFAULT_WORKSPACE_ROOT / "logs"
     )
+    # Directories already created by ensure_directories, so that every job
+    # after the first one skips the mkdir calls.
+    _ensured: Set[Path] = field(default_factory=set, init=False, repr=False, compare=False)
 
     def ensure_directories(self) -> None:
         for path in (
@@ -222,7 +266,18 @@ class WorkspaceSettings:
             self.published_directory,
             self.logs_directory,
         ):
-            path.mkdir(parents=True, exist_ok=True)
+            if path in self._ensured:
+                continue
+            # The parents usually exist already, so a single mkdir is tried
+            # before walking up the tree.
+            try:
+                path.mkdir()
+            except FileExistsError:
+                if not path.is_dir():
+                    raise
+            except FileNotFoundError:
+                path.mkdir(parents=True, exist_ok=True)
+            self._ensured.add(path)
 
 
 def ensure_project_structure() -> None:
@@ -263,13 +318,15 @@ def create_workspace_directories(workspace_id: int) -> WorkspaceDirectories:
 
     if not root.exists():
         # Support legacy timestamped directories by migrating the newest one
-        legacy_candidates = sorted(
-            DEFAULT_WORKSPACE_ROOT.glob(f"workspace_{workspace_id}__*"),
-            key=lambda path: path.stat().st_mtime,
-            reverse=True,
-        )
+        legacy_prefix = f"workspace_{workspace_id}__"
+        with os.scandir(DEFAULT_WORKSPACE_ROOT) as entries:
+            legacy_candidates = sorted(
+                (entry for entry in entries if entry.name.startswith(legacy_prefix)),
+                key=lambda entry: entry.stat().st_mtime,
+                reverse=True,
+            )
         if legacy_candidates:
-            legacy_candidates[0].rename(root)
+            os.rename(legacy_candidates[0].path, root)
 
     root.mkdir(parents=True, exist_ok=True)
 
@@ -294,12 +351,12 @@ def create_workspace_directories(workspace_id: int) -> WorkspaceDirectories:
 
 def workspace_layout_path(workspace_id: int) -> Path:
     ensure_project_structure()
-    return LAYOUTS_DIR / f"workspace_{workspace_id}.json"
+    return Path(_LAYOUTS_DIR_STR + os.sep + "workspace_" + str(workspace_id) + ".json")
 
 
-def load_workspace_layout(workspace_id: int) -> Dict[str, Dict[str, object]]:
-    ensure_project_structure()
-    path = workspace_layout_path(workspace_id)
+def _read_layout_file(path: Path) -> Optional[Dict[str, Dict[str, object]]]:
+    """Return the layout stored at ``path``, or ``None`` if missing or invalid."""
+
     if path.exists():
         try:
             payload = json.loads(path.read_text(encoding="utf-8"))
@@ -307,11 +364,34 @@ def load_workspace_layout(workspace_id: int) -> Dict[str, Dict[str, object]]:
                 return payload
         except json.JSONDecodeError:
             pass
+    return None
+
+
+def load_workspace_layout(workspace_id: int) -> Dict[str, Dict[str, object]]:
+    ensure_project_structure()
+    path = workspace_layout_path(workspace_id)
+    payload = _read_layout_file(path)
+    if payload is not None:
+        return payload
     layout = deepcopy(DEFAULT_LAYOUT_STATE)
     save_workspace_layout(workspace_id, layout)
     return layout
 
 
+def load_workspace_layout_readonly(workspace_id: int) -> Mapping[str, Mapping[str, object]]:
+    """Return a read-only view of the stored layout, or of the default one.
+
+    Unlike :func:`load_workspace_layout` this never copies nor writes the
+    default layout.
+    """
+
+    ensure_project_structure()
+    payload = _read_layout_file(workspace_layout_path(workspace_id))
+    if payload is None:
+        return _DEFAULT_LAYOUT_RO
+    return _freeze_layout(payload)
+
+
 def save_workspace_layout(workspace_id: int, layout: Dict[str, Dict[str, object]]) -> None:
     ensure_project_structure()
     path = workspace_layout_path(workspace_id)
@@ -337,16 +417,22 @@ def list_workspace_ids() -> List[int]:
     ensure_project_structure()
     ids: Set[int] = set()
     pattern = re.compile(r"workspace_(\d+)")
-    for path in DEFAULT_WORKSPACE_ROOT.iterdir():
-        if not path.is_dir():
-            continue
-        match = pattern.match(path.name)
-        if match:
-            ids.add(int(match.group(1)))
-    for path in LAYOUTS_DIR.glob("workspace_*.json"):
-        match = pattern.match(path.stem)
-        if match:
-            ids.add(int(match.group(1)))
+    # DirEntry carries the file type from the directory read, so telling
+    # workspace folders apart needs no stat call per entry.
+    with os.scandir(DEFAULT_WORKSPACE_ROOT) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            match = pattern.match(entry.name)
+            if match:
+                ids.add(int(match.group(1)))
+    with os.scandir(LAYOUTS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            match = pattern.match(entry.name)
+            if match:
+                ids.add(int(match.group(1)))
     return sorted(ids)
 
 
@@ -367,17 +453,22 @@ def locate_dependency(name: str) -> Optional[Path]:
     if found:
         return Path(found)
 
-    candidates = []
     hint_dir = DEPENDENCY_HINTS.get(name, DEPENDENCIES_ROOT)
-    if name == "yt-dlp":
-        candidates.append(hint_dir / "yt-dlp")
-        candidates.append(hint_dir / "yt-dlp.exe")
-    else:
-        candidates.append(hint_dir / name)
-        candidates.append(hint_dir / f"{name}.exe")
-
+    # A single directory listing covers both the bare and the ``.exe`` name;
+    # names are compared with normcase so that Windows matches e.g.
+    # ``FFmpeg.EXE``, and the bare name wins when both are present.
+    candidates = [os.path.normcase(name), os.path.normcase(f"{name}.exe")]
+    matches: Dict[str, str] = {}
+    try:
+        with os.scandir(hint_dir) as entries:
+            for entry in entries:
+                key = os.path.normcase(entry.name)
+                if key in candidates and key not in matches and entry.is_file():
+                    matches[key] = entry.path
+    except OSError:
+        pass
     for candidate in candidates:
-        if candidate.exists():
-            return candidate
+        if candidate in matches:
+            return Path(matches[candidate])
 
     return None
@@ -2,31 +2,33 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from enum import Enum, auto
+from enum import IntEnum
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, Iterable, List, Optional
 
 
-class JobStage(Enum):
+class JobStage(IntEnum):
     """Represents the different stages a job can be in."""
 
-    QUEUED = auto()
-    DOWNLOADING = auto()
-    PROCESSING = auto()
-    PUBLISHING = auto()
-    COMPLETED = auto()
-    FAILED = auto()
+    QUEUED = 0
+    DOWNLOADING = 1
+    PROCESSING = 2
+    PUBLISHING = 3
+    COMPLETED = 4
+    FAILED = 5
 
     def label(self) -> str:  # pragma: no cover - trivial mapping
-        mapping = {
-            JobStage.QUEUED: "⏳ In coda",
-            JobStage.DOWNLOADING: "⬇️ Download",
-            JobStage.PROCESSING: "⚙️ Elaborazione",
-            JobStage.PUBLISHING: "⬆️ Pubblicazione",
-            JobStage.COMPLETED: "✅ Completato",
-            JobStage.FAILED: "❌ Errore",
-        }
-        return mapping[self]
+        return _JOB_STAGE_LABELS[self]
+
+
+_JOB_STAGE_LABELS = {
+    JobStage.QUEUED: "⏳ In coda",
+    JobStage.DOWNLOADING: "⬇️ Download",
+    JobStage.PROCESSING: "⚙️ Elaborazione",
+    JobStage.PUBLISHING: "⬆️ Pubblicazione",
+    JobStage.COMPLETED: "✅ Completato",
+    JobStage.FAILED: "❌ Errore",
+}
 
 
 @dataclass(slots=True)
@@ -53,10 +55,38 @@ class VideoJob:
     published_directory: Path
     logs_directory: Path
     estimated_duration: Optional[float] = None
-    clip_plan: List[ClipTiming] = field(default_factory=list)
+    # The clip plan is stored column-wise; ``clip_plan`` exposes it as
+    # ``ClipTiming`` records for callers that want one object per clip.
+    clip_starts: List[float] = field(default_factory=list)
+    clip_ends: List[float] = field(default_factory=list)
+    clip_publish_after: List[int] = field(default_factory=list)
     status: JobStage = JobStage.QUEUED
     error: Optional[str] = None
 
+    @property
+    def clip_plan(self) -> List[ClipTiming]:
+        """Snapshot of the plan; changes to the records are not written back."""
+
+        return [
+            ClipTiming(
+                index=index,
+                start=start,
+                end=end,
+                duration=end - start,
+                publish_after_seconds=publish_after,
+            )
+            for index, (start, end, publish_after) in enumerate(
+                zip(self.clip_starts, self.clip_ends, self.clip_publish_after)
+            )
+        ]
+
+    @clip_plan.setter
+    def clip_plan(self, clips: Iterable[ClipTiming]) -> None:
+        clips = list(clips)
+        self.clip_starts = [clip.start for clip in clips]
+        self.clip_ends = [clip.end for clip in clips]
+        self.clip_publish_after = [clip.publish_after_seconds for clip in clips]
+
     def update_status(self, status: JobStage, error: Optional[str] = None) -> None:
         self.status = status
         self.error = error
@@ -9,12 +9,21 @@ some optional dependencies are missing.
 """
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
+import os
+import re
+import shutil
+import signal
 import subprocess
 import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
 from .config import (
     CLIPPERSUITE_ROOT,
@@ -25,9 +34,317 @@ from .config import (
     WorkspaceSettings,
     load_workspace_layout,
     locate_dependency,
+    workspace_layout_path,
 )
 from .models import ClipTiming, JobStage, ProgressCallback, VideoJob
-from .utils import generate_clip_plan, randomise_interval
+from .utils import format_srt_timestamp, generate_clip_plan, randomise_interval
+
+try:  # pragma: no cover - optional dependency
+    import av as _av  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _av = None
+
+
+# ffprobe only reports the one duration field, so a scan is enough; the JSON
+# parse remains as fallback for unexpected output.
+_DURATION_PATTERN = re.compile(rb'"duration"\s*:\s*"([\d.eE+\-]+)"')
+
+# Encoder threads given to every ffmpeg output; the number of concurrent ffmpeg
+# processes is derived from it so that renders never oversubscribe the CPU.
+# The semaphore is module-level, so the limit holds across every workspace.
+# Every output keeps its encoder (lookahead and reference frames) alive until
+# its process exits, so a process never gets more than MAX_OUTPUTS_PER_PROCESS
+# clips; longer plans are split into more batches that queue for a slot.
+FFMPEG_THREADS = 2
+MAX_FFMPEG_PROCESSES = max(1, (os.cpu_count() or 1) // FFMPEG_THREADS)
+MAX_OUTPUTS_PER_PROCESS = 4
+_FFMPEG_SEMAPHORE = threading.BoundedSemaphore(MAX_FFMPEG_PROCESSES)
+
+# A composited master costs a full extra encode and decode of the covered span,
+# so it is only built when configured overlaps make clips share at least this
+# fraction of that span.
+MASTER_MIN_SHARED_FRACTION = 0.25
+
+
+# Whisper models are loaded once per process and name, then shared by every
+# job; the lock keeps concurrent workspaces from loading the same model twice.
+# Each model comes with its own lock: its decoder installs kv-cache hooks on
+# the shared attention modules, so only one transcription may use it at once.
+_WHISPER_MODELS: Dict[str, Tuple[object, threading.Lock]] = {}
+_WHISPER_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_whisper():
+    """Import Whisper on first use, or return ``None`` if it is missing.
+
+    Whisper pulls in torch, so it is kept out of the process until a job
+    actually needs a transcription.
+    """
+
+    try:
+        import whisper  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    return whisper
+
+
+def _get_whisper_model(name: str) -> Tuple[object, threading.Lock]:
+    with _WHISPER_LOCK:
+        entry = _WHISPER_MODELS.get(name)
+        if entry is None:
+            entry = _WHISPER_MODELS[name] = (
+                _load_whisper().load_model(name),
+                threading.Lock(),
+            )
+        return entry
+
+
+@functools.lru_cache(maxsize=1)
+def _cuda_available() -> bool:
+    """Whether Whisper will run on a CUDA device (and thus share the GPU)."""
+
+    try:
+        import torch  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return False
+    return bool(torch.cuda.is_available())
+
+
+def _probe_duration_av(path: str) -> Optional[float]:
+    """Read the container duration in-process with PyAV, if it can tell."""
+
+    try:
+        with _av.open(path) as container:
+            if container.duration is None:
+                return None
+            return container.duration / _av.time_base
+    except Exception:  # pragma: no cover - depends on the media and PyAV build
+        return None
+
+
+def _probe_duration_ffprobe(ffprobe: str, path: str) -> float:
+    """Return the duration of the media at ``path`` as reported by ffprobe."""
+
+    args = [
+        ffprobe,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "json",
+        path,
+    ]
+    completed = subprocess.run(args, capture_output=True, check=True)
+    match = _DURATION_PATTERN.search(completed.stdout)
+    if match is not None:
+        duration = float(match.group(1))
+    else:
+        duration = float(json.loads(completed.stdout)["format"]["duration"])
+    return duration
+
+
+# ffmpeg writes machine readable progress to stderr with these options; the
+# key=value lines are parsed for out_time_ms (microseconds, despite the name).
+_PROGRESS_ARGS: Tuple[str, ...] = ("-progress", "pipe:2", "-nostats")
+_PROGRESS_LINE = re.compile(rb"^(\w+)=(\S*)$")
+_PROGRESS_INTERVAL = 0.5
+
+# Hardware H.264 encoders in order of preference; libx264 is the fallback.
+HARDWARE_ENCODERS: Tuple[str, ...] = ("h264_nvenc", "h264_qsv", "h264_videotoolbox")
+_UNPROBED = object()
+
+# Returned by the transcription worker when Whisper would run on CUDA: there it
+# competes with the encoder for the GPU, so render_job transcribes afterwards.
+_AFTER_RENDER = object()
+
+# Offset of a box's top-left corner from its anchor point, keyed by anchor.
+_ANCHOR_OFFSETS: Dict[str, Callable[[int, int], Tuple[int, int]]] = {
+    "topleft": lambda width, height: (0, 0),
+    "topright": lambda width, height: (-width, 0),
+    "bottomleft": lambda width, height: (0, -height),
+    "bottomright": lambda width, height: (-width, -height),
+    "top": lambda width, height: (-width // 2, 0),
+    "bottom": lambda width, height: (-width // 2, -height),
+    "left": lambda width, height: (0, -height // 2),
+    "right": lambda width, height: (-width, -height // 2),
+    "center": lambda width, height: (-width // 2, -height // 2),
+}
+
+# drawtext position expressions keyed by (anchor, axis); ``{}`` is the layer
+# coordinate.  Unknown anchors fall back to "center".
+_TEXT_POSITION_FORMATS: Dict[Tuple[str, str], str] = {
+    ("topleft", "x"): "{}",
+    ("topleft", "y"): "{}",
+    ("topright", "x"): "{} - text_w",
+    ("topright", "y"): "{} - text_w",
+    ("bottomleft", "x"): "{}",
+    ("bottomleft", "y"): "{} - text_h",
+    ("bottomright", "x"): "{} - text_w",
+    ("bottomright", "y"): "{} - text_h",
+    ("top", "x"): "{} - text_w/2",
+    ("top", "y"): "{}",
+    ("bottom", "x"): "{} - text_w/2",
+    ("bottom", "y"): "{} - text_h",
+    ("left", "x"): "{}",
+    ("left", "y"): "{} - text_h/2",
+    ("right", "x"): "{} - text_w",
+    ("right", "y"): "{} - text_h/2",
+    ("center", "x"): "{} - text_w/2",
+    ("center", "y"): "{} - text_h/2",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class _RenderGeometry:
+    """Canvas size and placement of the main video derived from a layout."""
+
+    canvas_width: int
+    canvas_height: int
+    target_width: int
+    target_height: int
+    overlay_x: int
+    overlay_y: int
+
+
+@dataclass(slots=True, frozen=True)
+class _BatchSpec:
+    """Job-wide inputs shared by every ffmpeg batch of a render."""
+
+    ffmpeg: str
+    video_file: Path
+    clips_directory: Path
+    # Composite of one clip as a str.format template over idx, start and end.
+    base_graph: str
+    text_layers: Tuple[Tuple[str, str, Optional[str]], ...]
+    encode_args: Tuple[str, ...]
+    decode_args: Tuple[str, ...]
+    # Pre-rendered composite of the span starting at plan_start, if any.
+    master_file: Optional[Path]
+    plan_start: float
+
+
+@dataclass(slots=True, frozen=True)
+class _Transcription:
+    """A transcription queued on the worker and the flag that abandons it."""
+
+    future: "Future[object]"
+    cancelled: threading.Event
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        self.future.cancel()
+
+
+def _composite_graph(
+    background_filter: str,
+    foreground_filter: str,
+    overlay_filter: str,
+    text_layers: Iterable[Tuple[str, str, Optional[str]]],
+) -> Tuple[List[str], str]:
+    """Return the statements compositing the whole first input and its label.
+
+    Only the head of each text layer is drawn, so the layers must be static.
+    """
+
+    statements = [
+        "[0:v]split[src_bg][src_fg];"
+        f"[src_bg]{background_filter}[bg];"
+        f"[src_fg]{foreground_filter}[fg];"
+        f"[bg][fg]{overlay_filter}[base]"
+    ]
+    current_label = "base"
+    for label, head, _ in text_layers:
+        statements.append(f"[{current_label}]{head}[{label}]")
+        current_label = label
+    return statements, current_label
+
+
+def _build_ffmpeg_args(
+    spec: _BatchSpec, batch: List[ClipTiming], filter_path: Path
+) -> Tuple[List[str], str, List[Path]]:
+    """Return the argv, filter script and output files for one batch.
+
+    ``filter_path`` is only referenced in the argv; writing the script there is
+    left to the caller.
+    """
+
+    batch_start = min(clip.start for clip in batch)
+    batch_end = max(clip.end for clip in batch)
+    filter_statements: List[str] = []
+    output_args: List[str] = []
+    output_files: List[Path] = []
+    # With a master the source is only read for its audio, as second input.
+    audio_map = "0:a?" if spec.master_file is None else "1:a?"
+    for clip in batch:
+        idx = clip.index
+        clip_start = clip.start - batch_start
+        clip_end = clip.end - batch_start
+        filter_statements.append(
+            spec.base_graph.format(idx=idx, start=clip_start, end=clip_end)
+        )
+        current_label = f"base_{idx}"
+        for label, head, tail in spec.text_layers:
+            next_label = f"{label}_{idx}"
+            text = head if tail is None else f"{head}{idx + 1}{tail}"
+            filter_statements.append(f"[{current_label}]{text}[{next_label}]")
+            current_label = next_label
+
+        output_file = spec.clips_directory / f"clip_{idx:03d}.mp4"
+        output_args.extend(
+            [
+                "-map",
+                f"[{current_label}]",
+                "-map",
+                audio_map,
+                "-ss",
+                str(clip_start),
+                "-t",
+                str(clip_end - clip_start),
+                *spec.encode_args,
+                str(output_file),
+            ]
+        )
+        output_files.append(output_file)
+    if len(batch) > 1:
+        # Every clip's own timeline starts at zero, so -progress would only
+        # report the longest clip written so far.  A stream copy of the video
+        # to the null muxer follows the read position over the whole batch.
+        output_args.extend(["-map", "0:v:0", "-c", "copy", "-f", "null", "-"])
+
+    source_args = [
+        "-ss",
+        str(batch_start),
+        "-to",
+        str(batch_end),
+        "-i",
+        str(spec.video_file),
+    ]
+    if spec.master_file is None:
+        input_args = [*spec.decode_args, *source_args]
+    else:
+        input_args = [
+            *spec.decode_args,
+            "-ss",
+            str(batch_start - spec.plan_start),
+            "-to",
+            str(batch_end - spec.plan_start),
+            "-i",
+            str(spec.master_file),
+            *source_args,
+        ]
+    args = [
+        spec.ffmpeg,
+        "-y",
+        *input_args,
+        "-filter_complex_script",
+        str(filter_path),
+        *output_args,
+    ]
+    return args, ";\n".join(filter_statements), output_files
 
 
 class DependencyError(RuntimeError):
@@ -58,9 +375,37 @@ class ClipperPipeline:
         self.settings = settings
         self.logger = PipelineLogger(callback)
         self._executables: Dict[str, str] = {}
+        self._hw_encoder: object = _UNPROBED
+        self.refresh_dependencies()
+        self._av_fallback_logged = False
+        self._layout_cache: Dict[
+            int, Tuple[int, Dict[str, Dict[str, object]], _RenderGeometry]
+        ] = {}
+        self._processes: Set[object] = set()
+        self._processes_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # Transcriptions run here, started as soon as a job's source is known.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"transcribe-{workspace_id}"
+        )
+        self._transcriptions: Dict[str, _Transcription] = {}
         self.workspace_id = workspace_id
 
     # ------------------------------------------------------------------ utils
+    def refresh_dependencies(self) -> None:
+        """Look up the external programs again, e.g. after installing them.
+
+        Programs that are found are cached for the life of the pipeline;
+        missing ones are searched again on use and only then reported.
+        """
+
+        self._executables.clear()
+        self._hw_encoder = _UNPROBED
+        for name in ("yt-dlp", "ffmpeg", "ffprobe"):
+            executable = locate_dependency(name)
+            if executable is not None:
+                self._executables[name] = str(executable)
+
     def _resolve_executable(self, name: str) -> str:
         if name not in self._executables:
             executable = locate_dependency(name)
@@ -79,8 +424,206 @@ class ClipperPipeline:
             self._executables[name] = str(executable)
         return self._executables[name]
 
-    def _run(self, args: List[str], cwd: Optional[Path] = None) -> None:
-        subprocess.run(args, cwd=cwd, check=True)
+    def _track(self, process: object, running: bool) -> None:
+        with self._processes_lock:
+            if running:
+                self._processes.add(process)
+            else:
+                self._processes.discard(process)
+
+    def terminate(self) -> None:
+        """Stop pending publication waits and SIGTERM running child processes.
+
+        Children that lead their own session (yt-dlp, which spawns ffmpeg
+        itself) are signalled as a whole process group; ffmpeg processes
+        started directly are signalled on their own.
+        """
+
+        self._stop_event.set()
+        with self._processes_lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                pid = process.pid  # type: ignore[attr-defined]
+                if hasattr(os, "killpg") and os.getpgid(pid) == pid:
+                    os.killpg(pid, signal.SIGTERM)
+                else:  # Windows, or an ffmpeg sharing our process group
+                    process.terminate()  # type: ignore[attr-defined]
+            except (OSError, ProcessLookupError):
+                pass
+
+    def close(self) -> None:
+        """Release the transcription worker; pending transcriptions are dropped."""
+
+        for identifier in list(self._transcriptions):
+            self.discard_job(identifier)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def discard_job(self, identifier: str) -> None:
+        """Abandon the transcription of a job that will not be rendered."""
+
+        transcription = self._transcriptions.pop(identifier, None)
+        if transcription is not None:
+            transcription.cancel()
+
+    def _run(
+        self, args: List[str], cwd: Optional[Path] = None, job: Optional[VideoJob] = None
+    ) -> None:
+        """Run ``args`` to completion, relaying its ``stderr``.
+
+        ``stderr`` is read line by line as it is produced, forwarded to the
+        logger when ``job`` is given, and its tail is attached to the
+        :class:`subprocess.CalledProcessError` raised on failure.
+        """
+
+        process = subprocess.Popen(
+            args,
+            cwd=cwd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            close_fds=True,
+            start_new_session=True,
+        )
+        self._track(process, True)
+        tail: Deque[str] = deque(maxlen=20)
+        try:
+            assert process.stderr is not None
+            with process.stderr:
+                for raw_line in process.stderr:
+                    line = raw_line.decode("utf-8", errors="replace").strip()
+                    if not line:
+                        continue
+                    tail.append(line)
+                    if job is not None:
+                        self.logger.emit(job, job.status, line)
+            returncode = process.wait()
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            self._track(process, False)
+        if returncode:
+            raise subprocess.CalledProcessError(
+                returncode, args, stderr="\n".join(tail)
+            )
+
+    async def _run_async(
+        self, args: List[str], on_progress: Optional[Callable[[float], None]] = None
+    ) -> None:
+        """Run ``args`` without blocking the event loop.
+
+        ``stderr`` is drained continuously (only its tail is kept for error
+        reporting) so that a chatty ffmpeg can never stall on a full pipe.  With
+        ``on_progress`` the stream is read line by line and every ``-progress``
+        position is passed on in seconds.
+        """
+
+        # Without close_fds or a new session CPython can launch the child with
+        # posix_spawn instead of fork, which stays cheap even when the parent
+        # holds a large Whisper model.  Descriptors are non-inheritable by
+        # default, so nothing leaks into ffmpeg.
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            close_fds=False,
+        )
+        self._track(process, True)
+        tail = b""
+        try:
+            assert process.stderr is not None
+            if on_progress is None:
+                while True:
+                    chunk = await process.stderr.read(65536)
+                    if not chunk:
+                        break
+                    tail = (tail + chunk)[-4096:]
+            else:
+                async for line in process.stderr:
+                    match = _PROGRESS_LINE.match(line.strip())
+                    if match is None:
+                        tail = (tail + line)[-4096:]
+                    elif match.group(1) == b"out_time_ms" and match.group(2).isdigit():
+                        on_progress(int(match.group(2)) / 1_000_000)
+            returncode = await process.wait()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        finally:
+            self._track(process, False)
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, args, stderr=tail)
+
+    async def _run_ffmpeg_async(
+        self, args: List[str], on_progress: Optional[Callable[[float], None]] = None
+    ) -> None:
+        # The slots are shared with other workspaces, each running its own
+        # event loop, so the semaphore is polled rather than awaited.
+        while not _FFMPEG_SEMAPHORE.acquire(blocking=False):
+            await asyncio.sleep(0.1)
+        try:
+            await self._run_async(args, on_progress)
+        finally:
+            _FFMPEG_SEMAPHORE.release()
+
+    async def _run_ffmpeg_batches(
+        self,
+        args_list: List[List[str]],
+        prelude: Optional[List[str]] = None,
+        job: Optional[VideoJob] = None,
+        spans: Optional[List[float]] = None,
+        prelude_span: float = 0.0,
+    ) -> None:
+        """Run the batches concurrently after the optional ``prelude``.
+
+        When ``job`` and the length of the timeline each batch reports its
+        progress on (``spans``, and ``prelude_span`` for the prelude) are
+        given, the overall render percentage is logged at most every
+        ``_PROGRESS_INTERVAL`` seconds.
+        """
+
+        if job is None or not spans:
+            if prelude is not None:
+                await self._run_ffmpeg_async(prelude)
+            await asyncio.gather(*(self._run_ffmpeg_async(args) for args in args_list))
+            return
+
+        # Slot 0 is the prelude; a missing prelude simply weighs nothing.
+        weights = [prelude_span if prelude is not None else 0.0, *spans]
+        total = sum(weights)
+        done = [0.0] * len(weights)
+        last_emit = time.monotonic()
+
+        def emit() -> None:
+            percent = int(100 * sum(done) / total) if total > 0 else 0
+            self.logger.emit(job, JobStage.PROCESSING, f"Rendering clip… {percent}%")
+
+        def reporter(position: int) -> Callable[[float], None]:
+            def report(seconds: float) -> None:
+                nonlocal last_emit
+                done[position] = min(seconds, weights[position])
+                now = time.monotonic()
+                if now - last_emit >= _PROGRESS_INTERVAL:
+                    last_emit = now
+                    emit()
+
+            return report
+
+        async def run(position: int, args: List[str]) -> None:
+            await self._run_ffmpeg_async(
+                [args[0], *_PROGRESS_ARGS, *args[1:]], reporter(position)
+            )
+            done[position] = weights[position]
+
+        if prelude is not None:
+            await run(0, prelude)
+            emit()
+        await asyncio.gather(
+            *(run(position, args) for position, args in enumerate(args_list, start=1))
+        )
 
     # ---------------------------------------------------------------- download
     def download(self, job: VideoJob) -> Path:
@@ -94,100 +637,156 @@ class ClipperPipeline:
             str(output_template),
             "--restrict-filenames",
         ]
-        self._run(args)
-        files = [file for file in job.download_path.iterdir() if file.is_file()]
+        self._run(args, job=job)
+        # DirEntry caches the stat result of the directory read, so neither the
+        # file filter nor the mtime sort issue extra syscalls.
+        with os.scandir(job.download_path) as entries:
+            files = [entry for entry in entries if entry.is_file(follow_symlinks=False)]
         if not files:
             raise RuntimeError("Download fallito: nessun file creato")
-        files.sort(key=lambda path: path.stat().st_mtime, reverse=True)
-        return files[0]
+        files.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        return Path(files[0].path)
 
     # --------------------------------------------------------------- inspection
-    def probe_duration(self, video_file: Path) -> float:
-        ffprobe = self._resolve_executable("ffprobe")
-        args = [
-            ffprobe,
-            "-v",
-            "error",
-            "-select_streams",
-            "v:0",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "json",
-            str(video_file),
-        ]
-        completed = subprocess.run(args, capture_output=True, text=True, check=True)
-        payload = json.loads(completed.stdout)
-        duration = float(payload["format"]["duration"])
-        return duration
+    def probe_duration(self, video_file: Path, job: Optional[VideoJob] = None) -> float:
+        if _av is not None:
+            duration = _probe_duration_av(str(video_file))
+            if duration is not None:
+                return duration
+        elif job is not None and not self._av_fallback_logged:
+            self._av_fallback_logged = True
+            self.logger.emit(
+                job, JobStage.PROCESSING, "PyAV non disponibile: durata letta con ffprobe"
+            )
+        return _probe_duration_ffprobe(self._resolve_executable("ffprobe"), str(video_file))
 
     # ------------------------------------------------------------- clip render
+    def _hardware_encoder(self, ffmpeg: str) -> Optional[str]:
+        """Return the first usable hardware H.264 encoder, probing only once.
+
+        Only encoders compiled into ffmpeg are considered, but builds often
+        list encoders whose hardware is missing, so each candidate is confirmed
+        with a one-frame test encode.
+        """
+
+        if self._hw_encoder is _UNPROBED:
+            self._hw_encoder = None
+            try:
+                listing = subprocess.run(
+                    [ffmpeg, "-hide_banner", "-encoders"],
+                    capture_output=True,
+                    text=True,
+                    timeout=30,
+                    check=False,
+                ).stdout
+            except (OSError, subprocess.SubprocessError):
+                listing = ""
+            for encoder in HARDWARE_ENCODERS:
+                if encoder not in listing:
+                    continue
+                probe = [
+                    ffmpeg,
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    "color=size=256x256:duration=0.1",
+                    "-frames:v",
+                    "1",
+                    "-c:v",
+                    encoder,
+                    "-f",
+                    "null",
+                    "-",
+                ]
+                try:
+                    completed = subprocess.run(
+                        probe, capture_output=True, timeout=30, check=False
+                    )
+                except (OSError, subprocess.SubprocessError):
+                    break
+                if completed.returncode == 0:
+                    self._hw_encoder = encoder
+                    break
+        return self._hw_encoder  # type: ignore[return-value]
+
+    def _select_encoder(self, ffmpeg: str) -> Optional[str]:
+        """Return the hardware encoder to use, or ``None`` for libx264."""
+
+        choice = self.settings.rendering.encoder
+        if choice == "auto":
+            return self._hardware_encoder(ffmpeg)
+        if choice in HARDWARE_ENCODERS:
+            return choice
+        return None
+
+    def _video_encode_args(self, encoder: Optional[str]) -> List[str]:
+        crf = self.settings.rendering.crf
+        if encoder == "h264_nvenc":
+            return [
+                "-c:v",
+                encoder,
+                "-preset",
+                "p4",
+                "-rc",
+                "vbr",
+                "-cq",
+                str(crf),
+                "-b:v",
+                "0",
+            ]
+        if encoder == "h264_qsv":
+            return ["-c:v", encoder, "-preset", "medium", "-global_quality", str(crf)]
+        if encoder == "h264_videotoolbox":
+            # VideoToolbox quality runs 1-100 (higher is better), unlike CRF.
+            quality = max(1, min(100, 100 - crf * 2))
+            return ["-c:v", encoder, "-q:v", str(quality)]
+        return [
+            "-c:v",
+            "libx264",
+            "-preset",
+            self.settings.rendering.x264_preset,
+            "-crf",
+            str(crf),
+            "-threads",
+            str(FFMPEG_THREADS),
+        ]
+
     def _anchor_offset(self, anchor: str, width: int, height: int) -> Tuple[int, int]:
-        anchor = anchor.lower()
-        if anchor == "topleft":
-            return (0, 0)
-        if anchor == "topright":
-            return (-width, 0)
-        if anchor == "bottomleft":
-            return (0, -height)
-        if anchor == "bottomright":
-            return (-width, -height)
-        if anchor == "top":
-            return (-width // 2, 0)
-        if anchor == "bottom":
-            return (-width // 2, -height)
-        if anchor == "left":
-            return (0, -height // 2)
-        if anchor == "right":
-            return (-width, -height // 2)
-        return (-width // 2, -height // 2)
+        offset = _ANCHOR_OFFSETS.get(anchor.lower(), _ANCHOR_OFFSETS["center"])
+        return offset(width, height)
 
     def _text_position(self, anchor: str, axis: str, value: int) -> str:
-        anchor = anchor.lower()
-        if anchor == "topleft":
-            return str(value)
-        if anchor == "topright":
-            return f"{value} - text_w"
-        if anchor == "bottomleft":
-            return f"{value} - text_h" if axis == "y" else str(value)
-        if anchor == "bottomright":
-            if axis == "x":
-                return f"{value} - text_w"
-            return f"{value} - text_h"
-        if anchor == "top":
-            if axis == "x":
-                return f"{value} - text_w/2"
-            return str(value)
-        if anchor == "bottom":
-            if axis == "x":
-                return f"{value} - text_w/2"
-            return f"{value} - text_h"
-        if anchor == "left":
-            if axis == "x":
-                return str(value)
-            return f"{value} - text_h/2"
-        if anchor == "right":
-            if axis == "x":
-                return f"{value} - text_w"
-            return f"{value} - text_h/2"
-        # center default
-        if axis == "x":
-            return f"{value} - text_w/2"
-        return f"{value} - text_h/2"
+        template = _TEXT_POSITION_FORMATS.get((anchor.lower(), axis))
+        if template is None:
+            template = _TEXT_POSITION_FORMATS[("center", axis)]
+        return template.format(value)
 
-    def render_clips(
-        self, video_file: Path, job: VideoJob, clip_plan: Iterable[ClipTiming]
-    ) -> List[Path]:
-        ffmpeg = self._resolve_executable("ffmpeg")
-        output_files: List[Path] = []
-        render_settings = self.settings.rendering
-        job.clips_directory.mkdir(parents=True, exist_ok=True)
-        layout = load_workspace_layout(job.workspace_id)
+    def _load_layout(
+        self, workspace_id: int
+    ) -> Tuple[Dict[str, Dict[str, object]], "_RenderGeometry"]:
+        """Return the workspace layout and the video geometry derived from it.
+
+        Both are cached per workspace and reused until the layout file's
+        modification time changes.
+        """
+
+        path = workspace_layout_path(workspace_id)
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        cached = self._layout_cache.get(workspace_id)
+        if cached is not None and mtime_ns is not None and cached[0] == mtime_ns:
+            return cached[1], cached[2]
+
+        layout = load_workspace_layout(workspace_id)
         canvas_config = layout.get("canvas", {})
         canvas_width = int(canvas_config.get("width", DEFAULT_CANVAS_WIDTH))
         canvas_height = int(canvas_config.get("height", DEFAULT_CANVAS_HEIGHT))
-        layers = layout.get("layers", {})
-        video_layer = layers.get("video_main", {})
+        video_layer = layout.get("layers", {}).get("video_main", {})
         video_scale = float(video_layer.get("scale", 1.0))
         fit_mode = str(video_layer.get("fit", "width")).lower()
         if fit_mode == "height":
@@ -202,136 +801,447 @@ class ClipperPipeline:
         offset_x, offset_y = self._anchor_offset(anchor, target_width, target_height)
         overlay_x = int(round(vx + offset_x))
         overlay_y = int(round(vy + offset_y))
-        overlay_x = max(min(overlay_x, canvas_width - target_width), 0)
-        overlay_y = max(min(overlay_y, canvas_height - target_height), 0)
+        geometry = _RenderGeometry(
+            canvas_width=canvas_width,
+            canvas_height=canvas_height,
+            target_width=target_width,
+            target_height=target_height,
+            overlay_x=max(min(overlay_x, canvas_width - target_width), 0),
+            overlay_y=max(min(overlay_y, canvas_height - target_height), 0),
+        )
 
-        for clip in clip_plan:
-            output_file = job.clips_directory / f"clip_{clip.index:03d}.mp4"
-            filter_statements = [
-                f"[0:v]scale={canvas_width}:{canvas_height},gblur=sigma=30[bg]",
-                f"[0:v]scale={target_width}:{target_height}[fg]",
-                f"[bg][fg]overlay={overlay_x}:{overlay_y}[base]",
-            ]
-            current_label = "base"
-            fontfile = None
-            if render_settings.font_path:
-                fontfile = render_settings.font_path.replace("'", "\\'")
-            title_layer = layers.get("title", {})
-            if render_settings.title and title_layer.get("visible", True):
-                title = render_settings.title.replace("'", "\\'")
-                tx = int(round(title_layer.get("x", canvas_width / 2)))
-                ty = int(round(title_layer.get("y", 140)))
-                x_expr = self._text_position(title_layer.get("anchor", "center"), "x", tx)
-                y_expr = self._text_position(title_layer.get("anchor", "center"), "y", ty)
-                drawtext = (
-                    f"[{current_label}]drawtext=text='{title}':fontcolor=white:"
-                    f"fontsize=56:x={x_expr}:y={y_expr}:line_spacing=6"
+        # load_workspace_layout may have just written the defaults.
+        try:
+            self._layout_cache[workspace_id] = (path.stat().st_mtime_ns, layout, geometry)
+        except OSError:
+            pass
+        return layout, geometry
+
+    def render_clips(
+        self, video_file: Path, job: VideoJob, clip_plan: Iterable[ClipTiming]
+    ) -> List[Path]:
+        """Render ``clip_plan``, falling back to libx264 if the hardware fails.
+
+        The one-frame probe cannot tell whether a full render will get its
+        encoder sessions (consumer GPUs allow only a few at a time), so a
+        failed hardware render is retried in software.
+        """
+
+        clips = list(clip_plan)
+        encoder = self._select_encoder(self._resolve_executable("ffmpeg"))
+        try:
+            return self._render_clips(video_file, job, clips, encoder)
+        except subprocess.CalledProcessError:
+            if encoder is None or self._stop_event.is_set():
+                raise
+        self.logger.emit(
+            job,
+            JobStage.PROCESSING,
+            f"Encoder {encoder} non riuscito: nuovo tentativo con libx264",
+        )
+        if self.settings.rendering.encoder == "auto":
+            self._hw_encoder = None
+        return self._render_clips(video_file, job, clips, None)
+
+    def _render_clips(
+        self,
+        video_file: Path,
+        job: VideoJob,
+        clip_plan: List[ClipTiming],
+        hardware_encoder: Optional[str],
+    ) -> List[Path]:
+        ffmpeg = self._resolve_executable("ffmpeg")
+        output_files: List[Path] = []
+        render_settings = self.settings.rendering
+        job.clips_directory.mkdir(parents=True, exist_ok=True)
+        job.processing_directory.mkdir(parents=True, exist_ok=True)
+        layout, geometry = self._load_layout(job.workspace_id)
+        layers = layout.get("layers", {})
+        canvas_width = geometry.canvas_width
+        canvas_height = geometry.canvas_height
+        target_width = geometry.target_width
+        target_height = geometry.target_height
+        overlay_x = geometry.overlay_x
+        overlay_y = geometry.overlay_y
+
+        # Clips are split into contiguous batches and every batch is cut from a
+        # single ffmpeg process: the source is demuxed and decoded once per batch
+        # and each output branch selects its span with trim.  Batches run
+        # concurrently on an event loop, bounded by the process-wide limit.
+        clips = list(clip_plan)
+        if not clips:
+            return output_files
+        # Everything but the clip number is invariant for the job, so the
+        # drawtext filters are prepared once as (label, head, tail) triples; a
+        # ``None`` tail marks a static text, otherwise the 1-based clip number
+        # is spliced between head and tail.
+        font_option = ""
+        if render_settings.font_path:
+            font_option = ":fontfile='{}'".format(
+                render_settings.font_path.replace("'", "\\'")
+            )
+        text_layers: List[Tuple[str, str, Optional[str]]] = []
+        title_layer = layers.get("title", {})
+        if render_settings.title and title_layer.get("visible", True):
+            title = render_settings.title.replace("'", "\\'")
+            title_anchor = title_layer.get("anchor", "center")
+            tx = int(round(title_layer.get("x", canvas_width / 2)))
+            ty = int(round(title_layer.get("y", 140)))
+            text_layers.append(
+                (
+                    "v_title",
+                    f"drawtext=text='{title}':fontcolor=white:fontsize=56:"
+                    f"x={self._text_position(title_anchor, 'x', tx)}:"
+                    f"y={self._text_position(title_anchor, 'y', ty)}:line_spacing=6"
+                    f"{font_option}",
+                    None,
                 )
-                if fontfile:
-                    drawtext += f":fontfile='{fontfile}'"
-                next_label = f"v_title_{clip.index}"
-                drawtext += f"[{next_label}]"
-                filter_statements.append(drawtext)
-                current_label = next_label
-            if render_settings.show_part_label:
-                part_layer = layers.get("part_label", {})
-                if part_layer.get("visible", True):
-                    prefix = self.settings.publication.part_label_prefix.replace(
-                        "'", "\\'"
-                    )
-                    part_text = f"{prefix} {clip.index + 1}"
-                    escaped_part = part_text.replace("'", "\\'")
-                    px = int(round(part_layer.get("x", canvas_width / 2)))
-                    py = int(round(part_layer.get("y", canvas_height - 120)))
-                    x_expr = self._text_position(
-                        part_layer.get("anchor", "center"), "x", px
-                    )
-                    y_expr = self._text_position(
-                        part_layer.get("anchor", "center"), "y", py
-                    )
-                    drawtext = (
-                        f"[{current_label}]drawtext=text='{escaped_part}':"
-                        "fontcolor=white:fontsize=44:x="
-                        f"{x_expr}:y={y_expr}:box=1:boxcolor=#00000066:boxborderw=18"
-                    )
-                    if fontfile:
-                        drawtext += f":fontfile='{fontfile}'"
-                    next_label = f"v_part_{clip.index}"
-                    drawtext += f"[{next_label}]"
-                    filter_statements.append(drawtext)
-                    current_label = next_label
-            link_layer = layers.get("link_label", {})
-            if link_layer.get("visible", True):
-                url_text = job.url.replace("'", "\\'")
-                lx = int(round(link_layer.get("x", 60)))
-                ly = int(round(link_layer.get("y", canvas_height - 160)))
-                x_expr = self._text_position(link_layer.get("anchor", "topleft"), "x", lx)
-                y_expr = self._text_position(link_layer.get("anchor", "topleft"), "y", ly)
-                drawtext = (
-                    f"[{current_label}]drawtext=text='{url_text}':fontcolor=#e2e8f0:"
-                    f"fontsize=32:x={x_expr}:y={y_expr}:box=1:boxcolor=#020617aa:boxborderw=12"
+            )
+        part_layer = layers.get("part_label", {})
+        if render_settings.show_part_label and part_layer.get("visible", True):
+            prefix = self.settings.publication.part_label_prefix.replace("'", "\\'")
+            part_anchor = part_layer.get("anchor", "center")
+            px = int(round(part_layer.get("x", canvas_width / 2)))
+            py = int(round(part_layer.get("y", canvas_height - 120)))
+            text_layers.append(
+                (
+                    "v_part",
+                    f"drawtext=text='{prefix} ",
+                    "':fontcolor=white:fontsize=44:"
+                    f"x={self._text_position(part_anchor, 'x', px)}:"
+                    f"y={self._text_position(part_anchor, 'y', py)}:"
+                    f"box=1:boxcolor=#00000066:boxborderw=18{font_option}",
+                )
+            )
+        link_layer = layers.get("link_label", {})
+        if link_layer.get("visible", True):
+            url_text = job.url.replace("'", "\\'")
+            link_anchor = link_layer.get("anchor", "topleft")
+            lx = int(round(link_layer.get("x", 60)))
+            ly = int(round(link_layer.get("y", canvas_height - 160)))
+            text_layers.append(
+                (
+                    "v_link",
+                    f"drawtext=text='{url_text}':fontcolor=#e2e8f0:fontsize=32:"
+                    f"x={self._text_position(link_anchor, 'x', lx)}:"
+                    f"y={self._text_position(link_anchor, 'y', ly)}:"
+                    f"box=1:boxcolor=#020617aa:boxborderw=12{font_option}",
+                    None,
+                )
+            )
+        queue_layer = layers.get("queue_label", {})
+        if queue_layer.get("visible", True) and job.clip_starts:
+            queue_anchor = queue_layer.get("anchor", "topleft")
+            qx = int(round(queue_layer.get("x", 60)))
+            qy = int(round(queue_layer.get("y", canvas_height - 120)))
+            text_layers.append(
+                (
+                    "v_queue",
+                    "drawtext=text='Clip ",
+                    f"/{len(job.clip_starts)}':fontcolor=#94a3b8:fontsize=26:"
+                    f"x={self._text_position(queue_anchor, 'x', qx)}:"
+                    f"y={self._text_position(queue_anchor, 'y', qy)}:"
+                    f"box=1:boxcolor=#020617aa:boxborderw=10{font_option}",
                 )
-                if fontfile:
-                    drawtext += f":fontfile='{fontfile}'"
-                next_label = f"v_link_{clip.index}"
-                drawtext += f"[{next_label}]"
-                filter_statements.append(drawtext)
-                current_label = next_label
-            queue_layer = layers.get("queue_label", {})
-            if queue_layer.get("visible", True) and job.clip_plan:
-                queue_text = f"Clip {clip.index + 1}/{len(job.clip_plan)}"
-                qx = int(round(queue_layer.get("x", 60)))
-                qy = int(round(queue_layer.get("y", canvas_height - 120)))
-                x_expr = self._text_position(queue_layer.get("anchor", "topleft"), "x", qx)
-                y_expr = self._text_position(queue_layer.get("anchor", "topleft"), "y", qy)
-                drawtext = (
-                    f"[{current_label}]drawtext=text='{queue_text}':fontcolor=#94a3b8:"
-                    f"fontsize=26:x={x_expr}:y={y_expr}:box=1:boxcolor=#020617aa:boxborderw=10"
+            )
+        # A full-canvas, unscaled video without overlays needs no filtering at
+        # all when the source already is H.264/AAC at the canvas resolution:
+        # the clips can then be cut with a plain stream copy.
+        if (
+            not text_layers
+            and (target_width, target_height) == (canvas_width, canvas_height)
+            and (overlay_x, overlay_y) == (0, 0)
+            and self._can_stream_copy(video_file, canvas_width, canvas_height)
+        ):
+            return self._copy_clips(ffmpeg, video_file, job, clips)
+
+        background_filter = f"scale={canvas_width}:{canvas_height},gblur=sigma=30"
+        foreground_filter = f"scale={target_width}:{target_height}"
+        overlay_filter = f"overlay={overlay_x}:{overlay_y}"
+        encode_args = [
+            *self._video_encode_args(hardware_encoder),
+            "-c:a",
+            "aac",
+            "-b:a",
+            "128k",
+        ]
+        decode_args = ["-hwaccel", "auto"] if hardware_encoder else []
+
+        # Back-to-back clips whose texts do not depend on the clip number are
+        # plain cuts of one rendered stream: the plan is split into contiguous
+        # groups, one ffmpeg pass per group renders its span once and the
+        # segment muxer splits it at the clip starts.  Hardware encoders turn
+        # forced key frames into non-IDR intra frames the muxer cannot cut at,
+        # so this path is only taken with libx264.
+        if (
+            hardware_encoder is None
+            and len(clips) > 1
+            and all(tail is None for _, _, tail in text_layers)
+            and all(
+                current.index == previous.index + 1
+                and abs(current.start - previous.end) < 1e-6
+                for previous, current in zip(clips, clips[1:])
+            )
+        ):
+            filter_statements, current_label = _composite_graph(
+                background_filter, foreground_filter, overlay_filter, text_layers
+            )
+            filter_path = job.processing_directory / "filter_segments.txt"
+            filter_path.write_text(";\n".join(filter_statements), encoding="utf-8")
+            # Every group needs a cut, so a group holds at least two clips.
+            groups = max(1, min(MAX_FFMPEG_PROCESSES, len(clips) // 2))
+            args_list: List[List[str]] = []
+            spans: List[float] = []
+            for number in range(groups):
+                group = clips[
+                    number * len(clips) // groups : (number + 1) * len(clips) // groups
+                ]
+                group_start = group[0].start
+                segment_times = ",".join(
+                    str(clip.start - group_start) for clip in group[1:]
                 )
-                if fontfile:
-                    drawtext += f":fontfile='{fontfile}'"
-                next_label = f"v_queue_{clip.index}"
-                drawtext += f"[{next_label}]"
-                filter_statements.append(drawtext)
-                current_label = next_label
-
-            filter_graph = ";".join(filter_statements)
-            args = [
+                args_list.append(
+                    [
+                        ffmpeg,
+                        "-y",
+                        "-ss",
+                        str(group_start),
+                        "-to",
+                        str(group[-1].end),
+                        "-i",
+                        str(video_file),
+                        "-filter_complex_script",
+                        str(filter_path),
+                        "-map",
+                        f"[{current_label}]",
+                        "-map",
+                        "0:a?",
+                        *encode_args,
+                        "-force_key_frames",
+                        segment_times,
+                        "-f",
+                        "segment",
+                        "-segment_times",
+                        segment_times,
+                        "-segment_start_number",
+                        str(group[0].index),
+                        "-reset_timestamps",
+                        "1",
+                        str(job.clips_directory / "clip_%03d.mp4"),
+                    ]
+                )
+                spans.append(group[-1].end - group_start)
+            asyncio.run(self._run_ffmpeg_batches(args_list, job=job, spans=spans))
+            return [job.clips_directory / f"clip_{clip.index:03d}.mp4" for clip in clips]
+
+        # When clips overlap, the composite of the shared spans would be
+        # computed more than once.  If the configured overlap makes that a
+        # sizeable share of the work, the whole covered span is composited a
+        # single time up front, static texts included, into a high quality
+        # master; the batches then only cut it and draw the texts that change
+        # per clip, taking the audio straight from the source.  The few seconds
+        # shared after the final clip is moved back never justify a master,
+        # and neither do hardware renders, which would encode it in software.
+        plan_start = min(clip.start for clip in clips)
+        plan_end = max(clip.end for clip in clips)
+        shared = sum(clip.end - clip.start for clip in clips) - (plan_end - plan_start)
+        master_file: Optional[Path] = None
+        master_args: Optional[List[str]] = None
+        if (
+            hardware_encoder is None
+            and render_settings.clip_overlap > 0
+            and shared >= MASTER_MIN_SHARED_FRACTION * (plan_end - plan_start)
+        ):
+            master_file = job.processing_directory / "master.mp4"
+            master_statements, master_label = _composite_graph(
+                background_filter,
+                foreground_filter,
+                overlay_filter,
+                [layer for layer in text_layers if layer[2] is None],
+            )
+            master_filter = job.processing_directory / "filter_master.txt"
+            master_filter.write_text(";\n".join(master_statements), encoding="utf-8")
+            master_args = [
                 ffmpeg,
                 "-y",
+                *decode_args,
                 "-ss",
-                str(clip.start),
+                str(plan_start),
                 "-to",
-                str(clip.end),
+                str(plan_end),
                 "-i",
                 str(video_file),
-                "-filter_complex",
-                filter_graph,
-                "-map",
-                f"[{current_label}]",
+                "-filter_complex_script",
+                str(master_filter),
                 "-map",
-                "0:a?",
+                f"[{master_label}]",
+                "-an",
                 "-c:v",
                 "libx264",
                 "-preset",
-                render_settings.x264_preset,
+                "ultrafast",
                 "-crf",
-                str(render_settings.crf),
-                "-c:a",
-                "aac",
-                "-b:a",
-                "128k",
-                str(output_file),
+                "14",
+                "-threads",
+                str(FFMPEG_THREADS),
+                str(master_file),
             ]
-            self._run(args)
+            text_layers = [layer for layer in text_layers if layer[2] is not None]
+
+        # The filters never contain braces, so they can be baked into the
+        # template as they are.
+        if master_file is None:
+            base_graph = (
+                "[0:v]trim=start={start}:end={end},split[src_bg_{idx}][src_fg_{idx}];"
+                f"[src_bg_{{idx}}]{background_filter}[bg_{{idx}}];"
+                f"[src_fg_{{idx}}]{foreground_filter}[fg_{{idx}}];"
+                f"[bg_{{idx}}][fg_{{idx}}]{overlay_filter}[base_{{idx}}]"
+            )
+        else:
+            base_graph = "[0:v]trim=start={start}:end={end}[base_{idx}]"
+        spec = _BatchSpec(
+            ffmpeg=ffmpeg,
+            video_file=video_file,
+            clips_directory=job.clips_directory,
+            base_graph=base_graph,
+            text_layers=tuple(text_layers),
+            encode_args=tuple(encode_args),
+            decode_args=tuple(decode_args),
+            master_file=master_file,
+            plan_start=plan_start,
+        )
+        workers = min(MAX_FFMPEG_PROCESSES, len(clips))
+        batch_size = min(-(-len(clips) // workers), MAX_OUTPUTS_PER_PROCESS)
+        if hardware_encoder is not None:
+            # Each output holds its own hardware encoder session until the
+            # process exits, so hardware renders use one clip per process.
+            batch_size = 1
+        args_list = []
+        spans = []
+        for offset in range(0, len(clips), batch_size):
+            batch = clips[offset : offset + batch_size]
+            spans.append(
+                max(clip.end for clip in batch) - min(clip.start for clip in batch)
+            )
+            # The graph grows with the batch, so it is handed over as a script
+            # file to keep the command line short and well below argv limits.
+            filter_path = job.processing_directory / f"filter_{batch[0].index:03d}.txt"
+            args, filter_script, batch_outputs = _build_ffmpeg_args(spec, batch, filter_path)
+            filter_path.write_text(filter_script, encoding="utf-8")
+            args_list.append(args)
+            output_files.extend(batch_outputs)
+
+        asyncio.run(
+            self._run_ffmpeg_batches(
+                args_list,
+                prelude=master_args,
+                job=job,
+                spans=spans,
+                prelude_span=plan_end - plan_start,
+            )
+        )
+        return output_files
+
+    def _can_stream_copy(self, video_file: Path, width: int, height: int) -> bool:
+        """Whether ``video_file`` already has the published format and size.
+
+        Clips are always published as H.264/AAC, so other codecs (VP9 and
+        Opus are common downloads) still have to be re-encoded.
+        """
+
+        ffprobe = self._resolve_executable("ffprobe")
+        args = [
+            ffprobe,
+            "-v",
+            "error",
+            "-show_entries",
+            "stream=codec_type,codec_name,width,height",
+            "-of",
+            "json",
+            str(video_file),
+        ]
+        try:
+            completed = subprocess.run(args, capture_output=True, text=True, check=True)
+            streams = json.loads(completed.stdout)["streams"]
+            video = next(
+                stream for stream in streams if stream.get("codec_type") == "video"
+            )
+            audio_codecs = {
+                stream.get("codec_name")
+                for stream in streams
+                if stream.get("codec_type") == "audio"
+            }
+            return (
+                video.get("codec_name") == "h264"
+                and (int(video["width"]), int(video["height"])) == (width, height)
+                and audio_codecs <= {"aac"}
+            )
+        except (subprocess.SubprocessError, ValueError, KeyError, TypeError, StopIteration):
+            return False
+
+    def _copy_clips(
+        self, ffmpeg: str, video_file: Path, job: VideoJob, clips: List[ClipTiming]
+    ) -> List[Path]:
+        """Cut ``clips`` from ``video_file`` without re-encoding.
+
+        Every clip reads its own input seeked to the clip start: a stream copy
+        can only begin at a key frame, and an output-side seek would drop the
+        video up to the next one while the audio already plays.
+        """
+
+        output_files: List[Path] = []
+        input_args: List[str] = []
+        output_args: List[str] = []
+        for number, clip in enumerate(clips):
+            output_file = job.clips_directory / f"clip_{clip.index:03d}.mp4"
+            input_args.extend(
+                [
+                    "-ss",
+                    str(clip.start),
+                    "-t",
+                    str(clip.end - clip.start),
+                    "-i",
+                    str(video_file),
+                ]
+            )
+            output_args.extend(
+                [
+                    "-map",
+                    f"{number}:v:0",
+                    "-map",
+                    f"{number}:a?",
+                    "-c",
+                    "copy",
+                    "-avoid_negative_ts",
+                    "make_zero",
+                    str(output_file),
+                ]
+            )
             output_files.append(output_file)
+        args = [ffmpeg, "-y", *input_args, *output_args]
+        # ffmpeg interleaves the inputs by timestamp, so the clips advance
+        # together and the process reports on the timeline of the longest.
+        asyncio.run(
+            self._run_ffmpeg_batches(
+                [args], job=job, spans=[max(clip.end - clip.start for clip in clips)]
+            )
+        )
         return output_files
 
     # ------------------------------------------------------------- transcription
-    def transcribe(self, video_file: Path, job: VideoJob) -> Optional[Path]:
-        try:
-            import whisper  # type: ignore
-        except Exception as exc:  # pragma: no cover - optional dependency
+    def transcribe(
+        self,
+        video_file: Path,
+        job: VideoJob,
+        cancelled: Optional[threading.Event] = None,
+    ) -> Optional[Path]:
+        """Write the subtitles of ``video_file``; ``None`` if none are written.
+
+        ``cancelled`` is checked before and after the Whisper call, which
+        itself cannot be interrupted.
+        """
+
+        if _load_whisper() is None:  # pragma: no cover - optional dependency
             self.logger.emit(
                 job,
                 JobStage.PROCESSING,
@@ -339,89 +1249,96 @@ class ClipperPipeline:
             )
             return None
 
-        model = whisper.load_model("small")
-        result = model.transcribe(str(video_file))
+        model, model_lock = _get_whisper_model(self.settings.rendering.whisper_model)
+        with model_lock:
+            if cancelled is not None and cancelled.is_set():
+                return None
+            segments = model.transcribe(str(video_file))["segments"]
+        if cancelled is not None and cancelled.is_set():
+            return None
         srt_path = job.clips_directory / f"{video_file.stem}.srt"
-        with open(srt_path, "w", encoding="utf-8") as handle:
-            for idx, segment in enumerate(result["segments"], start=1):
-                start = time.strftime(
-                    "%H:%M:%S,%f", time.gmtime(segment["start"])
-                )[:-3]
-                end = time.strftime("%H:%M:%S,%f", time.gmtime(segment["end"]))[:-3]
-                handle.write(f"{idx}\n{start} --> {end}\n{segment['text'].strip()}\n\n")
+        srt_path.write_text(
+            "".join(
+                f"{idx}\n{format_srt_timestamp(segment['start'])} --> "
+                f"{format_srt_timestamp(segment['end'])}\n{segment['text'].strip()}\n\n"
+                for idx, segment in enumerate(segments, start=1)
+            ),
+            encoding="utf-8",
+        )
         return srt_path
 
     # ------------------------------------------------------------- publication
     def publish_clips(self, clips: Iterable[Path], job: VideoJob) -> None:
+        asyncio.run(self._publish_clips_async(clips, job))
+
+    async def _sleep_unless_stopped(self, seconds: float) -> bool:
+        """Sleep ``seconds`` on the event loop; ``True`` if stopped meanwhile."""
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        while not self._stop_event.is_set():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(remaining, 0.1))
+        return True
+
+    async def _publish_clips_async(self, clips: Iterable[Path], job: VideoJob) -> None:
         publication = self.settings.publication
         base_interval = publication.publish_interval.seconds
         variation = publication.randomization_range_seconds
-        for index, (clip_meta, clip_file) in enumerate(zip(job.clip_plan, clips)):
-            if publication.randomize_interval:
-                publish_after = randomise_interval(base_interval, variation)
-            else:
-                publish_after = max(0, base_interval)
-            self.logger.emit(
-                job,
-                JobStage.PUBLISHING,
-                f"Clip {index + 1}: attesa {publish_after} secondi prima della pubblicazione",
-            )
-            clip_meta.publish_after_seconds = publish_after
-            # Here we would interact with the TikTok API using the access token.
-            # To keep the sample self contained, we only simulate a delay.
-            simulated_wait = min(publish_after, 5)
-            if simulated_wait:
-                time.sleep(simulated_wait)
-            log_path = job.published_directory / f"clip_{index + 1:03d}.txt"
-            try:
-                log_path.write_text(
-                    (
-                        f"clip: {clip_file.name}\n"
-                        f"ritardo_secondi: {publish_after}\n"
-                    ),
-                    encoding="utf-8",
+        records: List[str] = []
+        try:
+            for index, clip_file in zip(range(len(job.clip_publish_after)), clips):
+                if publication.randomize_interval:
+                    publish_after = randomise_interval(base_interval, variation)
+                else:
+                    publish_after = max(0, base_interval)
+                self.logger.emit(
+                    job,
+                    JobStage.PUBLISHING,
+                    f"Clip {index + 1}: attesa {publish_after} secondi "
+                    "prima della pubblicazione",
                 )
-            except OSError:
-                pass
+                job.clip_publish_after[index] = publish_after
+                # Here we would interact with the TikTok API using the access token.
+                # To keep the sample self contained, we only simulate a delay; the
+                # wait is cut short when the workspace is being stopped.
+                simulated_wait = min(publish_after, 5)
+                if simulated_wait and await self._sleep_unless_stopped(simulated_wait):
+                    raise RuntimeError("Pubblicazione interrotta")
+                records.append(
+                    f"clip: {clip_file.name}\nritardo_secondi: {publish_after}\n\n"
+                )
+        finally:
+            if records:
+                log_path = job.published_directory / "publication_log.txt"
+                try:
+                    with open(log_path, "a", encoding="utf-8") as handle:
+                        handle.writelines(records)
+                except OSError:
+                    pass
         # Simulate successful publication by removing files after loop in cleanup.
 
     # --------------------------------------------------------------- clean up
     def cleanup(self, job: VideoJob) -> None:
-        if job.download_path.exists():
-            for file in job.download_path.iterdir():
-                if file.is_file():
-                    file.unlink()
-            try:
-                job.download_path.rmdir()
-            except OSError:  # pragma: no cover - best effort cleanup
-                pass
-        if job.processing_directory.exists():
-            for file in job.processing_directory.iterdir():
-                if file.is_file():
-                    file.unlink()
-            try:
-                job.processing_directory.rmdir()
-            except OSError:
-                pass
-        if job.clips_directory.exists() and job.status is JobStage.COMPLETED:
-            for file in job.clips_directory.iterdir():
-                if file.is_file():
-                    file.unlink()
-            try:
-                job.clips_directory.rmdir()
-            except OSError:  # pragma: no cover - best effort cleanup
-                pass
+        shutil.rmtree(job.download_path, ignore_errors=True)
+        shutil.rmtree(job.processing_directory, ignore_errors=True)
+        if job.status is JobStage.COMPLETED:
+            shutil.rmtree(job.clips_directory, ignore_errors=True)
         # clips are deleted only after publication has succeeded, therefore we
         # leave them on disk until the publish step returns without raising.
 
     # -------------------------------------------------------------------- main
-    def process_job(self, job: VideoJob) -> None:
+    def prepare_job(self, job: VideoJob) -> Path:
+        """Download ``job`` and compute its clip plan; returns the media file."""
+
         self.settings.ensure_directories()
         job.update_status(JobStage.DOWNLOADING)
         self.logger.emit(job, JobStage.DOWNLOADING, "Download in corso…")
         video_file = self.download(job)
         job.update_status(JobStage.PROCESSING)
-        duration = self.probe_duration(video_file)
+        duration = self.probe_duration(video_file, job)
         job.estimated_duration = duration
         clip_ranges = generate_clip_plan(
             duration,
@@ -430,25 +1347,68 @@ class ClipperPipeline:
             final_min=self.settings.rendering.final_clip_min,
             final_max=self.settings.rendering.final_clip_max,
         )
-        job.clip_plan = [
-            ClipTiming(
-                index=index,
-                start=start,
-                end=end,
-                duration=end - start,
-                publish_after_seconds=0,
+        job.clip_starts = [start for start, _ in clip_ranges]
+        job.clip_ends = [end for _, end in clip_ranges]
+        job.clip_publish_after = [0] * len(clip_ranges)
+        # Whisper only reads the source, so it can start right away and overlap
+        # both the wait for the renderer and the render itself.
+        if not self._stop_event.is_set():
+            job.clips_directory.mkdir(parents=True, exist_ok=True)
+            cancelled = threading.Event()
+            self._transcriptions[job.identifier] = _Transcription(
+                self._executor.submit(self._transcribe_early, video_file, job, cancelled),
+                cancelled,
             )
-            for index, (start, end) in enumerate(clip_ranges)
-        ]
-        self.logger.emit(job, JobStage.PROCESSING, "Rendering clip…")
-        clips = self.render_clips(video_file, job, job.clip_plan)
+        return video_file
+
+    def _transcribe_early(
+        self, video_file: Path, job: VideoJob, cancelled: threading.Event
+    ) -> object:
+        """Worker side of the transcription started by :meth:`prepare_job`."""
+
+        if cancelled.is_set():
+            return None
+        # torch is imported here, on the worker, rather than in the download stage.
+        if _load_whisper() is not None and _cuda_available():
+            return _AFTER_RENDER
         self.logger.emit(job, JobStage.PROCESSING, "Trascrizione audio…")
-        subtitle_path = self.transcribe(video_file, job)
+        return self.transcribe(video_file, job, cancelled)
+
+    def render_job(self, job: VideoJob, video_file: Path) -> List[Path]:
+        """Render the planned clips of ``job`` and collect its transcription."""
+
+        job.update_status(JobStage.PROCESSING)
+        self.logger.emit(job, JobStage.PROCESSING, "Rendering clip…")
+        transcription = self._transcriptions.pop(job.identifier, None)
+        try:
+            clips = self.render_clips(video_file, job, job.clip_plan)
+        except BaseException:
+            # A transcription already inside Whisper still runs to the end and
+            # holds the worker, but no longer writes its subtitles.
+            if transcription is not None:
+                transcription.cancel()
+            raise
+        subtitle_path = (
+            _AFTER_RENDER if transcription is None else transcription.future.result()
+        )
+        if subtitle_path is _AFTER_RENDER:
+            self.logger.emit(job, JobStage.PROCESSING, "Trascrizione audio…")
+            subtitle_path = self.transcribe(video_file, job)
         if subtitle_path:
             self.logger.emit(job, JobStage.PROCESSING, f"Sottotitoli: {subtitle_path.name}")
+        return clips
+
+    def finish_job(self, job: VideoJob, clips: List[Path]) -> None:
+        """Publish the rendered ``clips`` and clean up the job directories."""
+
         job.update_status(JobStage.PUBLISHING)
         self.logger.emit(job, JobStage.PUBLISHING, "Pubblicazione delle clip…")
         self.publish_clips(clips, job)
         job.update_status(JobStage.COMPLETED)
         self.logger.emit(job, JobStage.COMPLETED, "Completato")
         self.cleanup(job)
+
+    def process_job(self, job: VideoJob) -> None:
+        video_file = self.prepare_job(job)
+        clips = self.render_job(job, video_file)
+        self.finish_job(job, clips)
@@ -26,6 +26,16 @@ def format_timedelta(seconds: float) -> str:
     return " ".join(parts)
 
 
+def format_srt_timestamp(seconds: float) -> str:
+    """Return ``seconds`` as an SRT timestamp (``HH:MM:SS,mmm``)."""
+
+    milliseconds = int(round(max(0.0, seconds) * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+
+
 def generate_clip_plan(
     duration: float,
     clip_duration: int,
@@ -43,18 +53,15 @@ def generate_clip_plan(
         return []
 
     clip_duration = max(1, clip_duration)
-    overlap = max(0, overlap)
-    clips: List[Tuple[float, float]] = []
-    start = 0.0
-    while start < duration:
-        end = start + clip_duration
-        clips.append((start, min(end, duration)))
-        start = end - overlap
-        if start >= duration:
-            break
-
-    if not clips:
-        return []
+    # Clip starts form an arithmetic progression, so they are generated in one
+    # pass instead of being accumulated step by step.  The overlap is capped so
+    # that consecutive clips always advance.
+    step = clip_duration - min(max(0, overlap), clip_duration - 1)
+    count = math.ceil(duration / step)
+    clips: List[Tuple[float, float]] = [
+        (start, min(start + clip_duration, duration))
+        for start in map(float, range(0, count * step, step))
+    ]
 
     # Adjust final clip length to comply with the [final_min, final_max] rule.
     final_start, final_end = clips[-1]
@@ -7,7 +7,7 @@ import time
 import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from .config import WorkspaceSettings
 from .models import JobStage, ProgressCallback, VideoJob
@@ -21,8 +21,19 @@ class QueueItem:
     created_at: float = field(default_factory=time.time)
 
 
+# Maximum number of jobs waiting between two stages.  Keeping the hand-off
+# queues short applies back-pressure: the downloader never runs more than a
+# couple of jobs ahead of the renderer.
+STAGE_QUEUE_SIZE = 2
+
+
 class WorkspaceController:
-    """Serial controller responsible for handling jobs in a workspace."""
+    """Controller responsible for handling jobs in a workspace.
+
+    Jobs flow through three worker threads (download, render, publish) linked
+    by bounded queues, so the download of a job overlaps the rendering of the
+    previous one and the publication of the one before it.
+    """
 
     def __init__(
         self,
@@ -34,11 +45,22 @@ class WorkspaceController:
         self.settings = settings
         self.callback = callback
         self._queue: "queue.Queue[QueueItem]" = queue.Queue()
+        self._render_queue: "queue.Queue[Tuple[VideoJob, Path]]" = queue.Queue(
+            maxsize=STAGE_QUEUE_SIZE
+        )
+        self._publish_queue: "queue.Queue[Tuple[VideoJob, List[Path]]]" = queue.Queue(
+            maxsize=STAGE_QUEUE_SIZE
+        )
         self._stop_event = threading.Event()
         self.pipeline = ClipperPipeline(settings, self._emit, workspace_id)
-        self._thread = threading.Thread(target=self._worker, daemon=True)
-        self._thread.start()
-        self.active_job: Optional[VideoJob] = None
+        self.active_jobs: Dict[str, VideoJob] = {}
+        self._threads = [
+            threading.Thread(target=self._download_worker, daemon=True),
+            threading.Thread(target=self._render_worker, daemon=True),
+            threading.Thread(target=self._publish_worker, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
 
     # ----------------------------------------------------------------- helpers
     def _emit(self, job: VideoJob, stage: JobStage, message: str) -> None:
@@ -70,39 +92,88 @@ class WorkspaceController:
 
     def stop(self) -> None:
         self._stop_event.set()
-        self._thread.join(timeout=1)
+        self.pipeline.terminate()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self.pipeline.close()
 
     # ------------------------------------------------------------------- worker
-    def _worker(self) -> None:
+    def _fail(self, job: VideoJob, exc: Exception) -> None:
+        self.active_jobs.pop(job.identifier, None)
+        self.pipeline.discard_job(job.identifier)
+        if isinstance(exc, DependencyError):
+            job.update_status(JobStage.FAILED, str(exc))
+            self._emit(job, JobStage.FAILED, str(exc))
+        else:  # pragma: no cover - safety net
+            job.update_status(JobStage.FAILED, str(exc))
+            self._emit(job, JobStage.FAILED, f"Errore inatteso: {exc}")
+
+    def _get(self, source: "queue.Queue"):
         while not self._stop_event.is_set():
             try:
-                queue_item = self._queue.get(timeout=0.2)
+                return source.get(timeout=0.2)
             except queue.Empty:
                 continue
+        return None
+
+    def _put(self, target: "queue.Queue", item: object) -> bool:
+        while not self._stop_event.is_set():
+            try:
+                target.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _download_worker(self) -> None:
+        while True:
+            queue_item = self._get(self._queue)
+            if queue_item is None:
+                return
             job = queue_item.job
-            self.active_job = job
+            self.active_jobs[job.identifier] = job
             try:
-                self.pipeline.process_job(job)
-            except DependencyError as exc:
-                job.update_status(JobStage.FAILED, str(exc))
-                self._emit(job, JobStage.FAILED, str(exc))
-            except Exception as exc:  # pragma: no cover - safety net
-                job.update_status(JobStage.FAILED, str(exc))
-                self._emit(job, JobStage.FAILED, f"Errore inatteso: {exc}")
+                video_file = self.pipeline.prepare_job(job)
+            except Exception as exc:
+                self._fail(job, exc)
+            else:
+                if not self._put(self._render_queue, (job, video_file)):
+                    self.pipeline.discard_job(job.identifier)
             finally:
-                self.active_job = None
                 self._queue.task_done()
 
+    def _render_worker(self) -> None:
+        while True:
+            item = self._get(self._render_queue)
+            if item is None:
+                return
+            job, video_file = item
+            try:
+                clips = self.pipeline.render_job(job, video_file)
+            except Exception as exc:
+                self._fail(job, exc)
+            else:
+                self._put(self._publish_queue, (job, clips))
+
+    def _publish_worker(self) -> None:
+        while True:
+            item = self._get(self._publish_queue)
+            if item is None:
+                return
+            job, clips = item
+            try:
+                self.pipeline.finish_job(job, clips)
+            except Exception as exc:
+                self._fail(job, exc)
+            else:
+                self.active_jobs.pop(job.identifier, None)
+
     # --------------------------------------------------------------- estimation
     def estimate_completion(self, job: VideoJob) -> Optional[str]:
-        if not job.clip_plan:
+        if not job.clip_publish_after:
             return None
-        base = self.settings.publication.publish_interval.seconds
-        intervals = [
-            clip.publish_after_seconds if clip.publish_after_seconds else max(0, base)
-            for clip in job.clip_plan
-        ]
-        estimate_seconds = sum(intervals)
+        fallback = max(0, self.settings.publication.publish_interval.seconds)
+        estimate_seconds = sum(after or fallback for after in job.clip_publish_after)
         if estimate_seconds <= 0:
             return None
         return format_timedelta(estimate_seconds)